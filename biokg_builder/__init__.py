@@ -2,13 +2,8 @@
 BioKG-Builder: AI-driven biomedical literature knowledge graph generator
 """
 
+import importlib
 from .__version__ import __version__
-from .core import BioKGBuilder
-from .searcher import PubMedSearcher
-from .analyzer import CausalAnalyzer
-from .processor import EntityProcessor
-from .visualizer import NetworkVisualizer
-from .generator import ReportGenerator
 from .config import Config
 
 __all__ = [
@@ -22,6 +17,30 @@ __all__ = [
     "__version__"
 ]
 
+# Heavy components are imported on first access (PEP 562)
+_LAZY_IMPORTS = {
+    "BioKGBuilder": "core",
+    "PubMedSearcher": "searcher",
+    "CausalAnalyzer": "analyzer",
+    "EntityProcessor": "processor",
+    "NetworkVisualizer": "visualizer",
+    "ReportGenerator": "generator",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        module = importlib.import_module(f".{_LAZY_IMPORTS[name]}", __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
+
 # Convenience function for quickly building knowledge graphs
 def build_knowledge_graph(keyword, email=None, api_key=None, **kwargs):
     """
@@ -36,5 +55,6 @@ def build_knowledge_graph(keyword, email=None, api_key=None, **kwargs):
     Returns:
         dict: Dictionary containing results
     """
+    from .core import BioKGBuilder
     builder = BioKGBuilder(email=email, api_key=api_key)
     return builder.build_knowledge_graph(keyword, **kwargs)
\ No newline at end of file
@@ -2,11 +2,28 @@
 
 import pandas as pd
 import os
-from typing import Dict, Any
-from openai import OpenAI
+import re
+from typing import Dict, Any, List
+from openai import AsyncOpenAI
+from tqdm import tqdm
 from .config import Config
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from .cache import LLMCache
+from .utils import write_dataframe, read_dataframe
+from .llm import get_openai_client, get_rate_limiter, call_with_retry, acall_with_retry
+from concurrent.futures import ThreadPoolExecutor
 import threading
+import asyncio
+import functools
+import logging
+
+
+BATCH_SEPARATOR = "###"
+EMPTY_BLOCK = "NONE"  # Placeholder the batch prompt asks for when an abstract has no relationships
+END_SENTINEL = "###END"
+MAX_TOKENS_PER_ABSTRACT = 512
+MAX_COMPLETION_TOKENS = 8192
+
+logger = logging.getLogger(__name__)
 
 
 class CausalAnalyzer:
@@ -14,57 +31,298 @@ class CausalAnalyzer:
     
     def __init__(self, config: Config):
         self.config = config
-        self.client = OpenAI(api_key=config.api_key, base_url=config.base_url)
+        self.client = get_openai_client(config.api_key, config.base_url, config.max_workers * 2)
+        self.limiter = get_rate_limiter(config.requests_per_minute)
         self.lock = threading.Lock()
-        self.completed_count = 0
+        self.cache = None
+        self.refresh_cache = False  # Skip cache lookups (responses are still stored)
+    
+    def _get_cache(self):
+        """Lazy open the LLM response cache"""
+        with self.lock:
+            if self.cache is None and self.config.use_cache:
+                self.cache = LLMCache(
+                    os.path.join(self.config.output_dir, self.config.llm_cache_file),
+                    similarity_threshold=self.config.similarity_threshold,
+                    model_path=self.config.sentence_model_path if self.config.semantic_cache else None
+                )
+        return self.cache
+    
+    def _complete(self, messages: list, max_tokens: int) -> str:
+        """Rate-limited streaming chat completion with retries on transient errors"""
+        def stream_completion():
+            stream = self.client.chat.completions.create(
+                model=self.config.llm_model,
+                messages=messages,
+                max_tokens=max_tokens,
+                stream=True,
+                stop=[END_SENTINEL]
+            )
+            text = ""
+            try:
+                for chunk in stream:
+                    if chunk.choices:
+                        start = max(0, len(text) - len(END_SENTINEL))
+                        text += chunk.choices[0].delta.content or ""
+                        if END_SENTINEL in text[start:]:
+                            break
+            finally:
+                stream.close()
+            return text.split(END_SENTINEL)[0]
+        
+        return call_with_retry(stream_completion, limiter=self.limiter, max_retries=self.config.max_retries)
+    
+    async def _acomplete(self, aclient: AsyncOpenAI, messages: list, max_tokens: int) -> str:
+        """Async rate-limited streaming chat completion with retries on transient errors"""
+        async def stream_completion():
+            stream = await aclient.chat.completions.create(
+                model=self.config.llm_model,
+                messages=messages,
+                max_tokens=max_tokens,
+                stream=True,
+                stop=[END_SENTINEL]
+            )
+            text = ""
+            try:
+                async for chunk in stream:
+                    if chunk.choices:
+                        start = max(0, len(text) - len(END_SENTINEL))
+                        text += chunk.choices[0].delta.content or ""
+                        if END_SENTINEL in text[start:]:
+                            break
+            finally:
+                await stream.close()
+            return text.split(END_SENTINEL)[0]
+        
+        return await acall_with_retry(stream_completion, limiter=self.limiter, max_retries=self.config.max_retries)
+    
+    def _cached_complete(self, messages: list, max_tokens: int) -> str:
+        """Chat completion served from the cache when possible"""
+        cache = self._get_cache()
+        if cache and not self.refresh_cache:
+            content = cache.get(self.config.llm_model, messages)
+            if content is not None:
+                return content
+        
+        content = self._complete(messages, max_tokens)
+        
+        if cache:
+            cache.set(self.config.llm_model, messages, content)
+        return content
+    
+    @staticmethod
+    def _end_instruction() -> str:
+        """Instruction that lets streaming stop as soon as the model is done"""
+        return f"When done, output {END_SENTINEL}"
+    
+    def _abstract_messages(self, abstract: str) -> list:
+        """Messages for analyzing a single abstract"""
+        return [
+            {"role": "system", "content": f"{self.config.causal_analysis_prompt} {self._end_instruction()}"},
+            {"role": "user", "content": str(abstract)}
+        ]
     
     def analyze_abstract(self, abstract: str) -> str:
         """Analyze causal relationships in a single abstract"""
         if not abstract or pd.isna(abstract):
             return ""
         
-        messages = [
-            {"role": "system", "content": self.config.causal_analysis_prompt},
-            {"role": "user", "content": str(abstract)}
-        ]
+        try:
+            return self._cached_complete(self._abstract_messages(abstract), MAX_TOKENS_PER_ABSTRACT).strip()
+        except Exception as e:
+            print(f"Error analyzing abstract: {e}")
+            return ""
+    
+    @staticmethod
+    async def _in_thread(func, *args):
+        """Run blocking work (SQLite, embedding model) off the event loop; asyncio.to_thread needs 3.9+"""
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(func, *args))
+    
+    async def _acached_complete(self, aclient: AsyncOpenAI, messages: list, max_tokens: int) -> str:
+        """Async chat completion served from the cache when possible"""
+        cache = await self._in_thread(self._get_cache)
+        if cache and not self.refresh_cache:
+            content = await self._in_thread(cache.get, self.config.llm_model, messages)
+            if content is not None:
+                return content
+        
+        content = await self._acomplete(aclient, messages, max_tokens)
+        
+        if cache:
+            await self._in_thread(cache.set, self.config.llm_model, messages, content)
+        return content
+    
+    async def _analyze_abstract_async(self, aclient: AsyncOpenAI, abstract: str) -> str:
+        """Analyze causal relationships in a single abstract (async)"""
+        if not abstract or pd.isna(abstract):
+            return ""
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.config.llm_model,
-                messages=messages,
-                max_tokens=2000
-            )
-            return response.choices[0].message.content.strip()
+            content = await self._acached_complete(aclient, self._abstract_messages(abstract), MAX_TOKENS_PER_ABSTRACT)
+            return content.strip()
         except Exception as e:
             print(f"Error analyzing abstract: {e}")
             return ""
     
-    def analyze_single_row(self, index: int, row: pd.Series, total_rows: int) -> tuple:
-        """Analyze a single row"""
-        abstract = row['Abstract']
+    def _batch_messages(self, abstracts: List[str]) -> list:
+        """Messages for analyzing several numbered abstracts in one request"""
+        user_content = "\n---\n".join(f"{n}. {abstract}" for n, abstract in enumerate(abstracts, 1))
+        return [
+            {"role": "system", "content": (
+                f"{self.config.causal_analysis_prompt} {self.config.batch_analysis_prompt} {self._end_instruction()}"
+            )},
+            {"role": "user", "content": user_content}
+        ]
+    
+    def _lookup_batch(self, abstracts: List[str]) -> tuple:
+        """Fill cached results and return (results, positions still pending)"""
+        results = [""] * len(abstracts)
+        pending = [i for i, abstract in enumerate(abstracts) if abstract and not pd.isna(abstract)]
+        
+        # Serve cached abstracts individually so batch composition does not affect hits
+        cache = self._get_cache()
+        if cache and not self.refresh_cache:
+            for i in list(pending):
+                content = cache.get(self.config.llm_model, self._abstract_messages(abstracts[i]))
+                if content is not None:
+                    results[i] = content.strip()
+                    pending.remove(i)
         
+        return results, pending
+    
+    def _store_batch(self, abstracts: List[str], pending: List[int], blocks: List[str]) -> None:
+        """Cache each block of an aligned batch response under its own abstract"""
+        cache = self._get_cache()
+        if cache:
+            for i, block in zip(pending, blocks):
+                cache.set(self.config.llm_model, self._abstract_messages(abstracts[i]), block)
+    
+    def _analyze_batch(self, abstracts: List[str]) -> List[str]:
+        """Analyze several abstracts with a single request"""
+        results, pending = self._lookup_batch(abstracts)
+        
+        if len(pending) <= 1:
+            for i in pending:
+                results[i] = self.analyze_abstract(abstracts[i])
+            return results
+        
+        try:
+            content = self._complete(
+                self._batch_messages([abstracts[i] for i in pending]),
+                min(MAX_TOKENS_PER_ABSTRACT * len(pending), MAX_COMPLETION_TOKENS)
+            )
+            blocks = self._split_batch_response(content, len(pending))
+        except Exception as e:
+            print(f"Error analyzing abstract batch: {e}")
+            blocks = []
+        
+        # Fall back to one request per abstract if the response cannot be aligned
+        if len(blocks) != len(pending):
+            blocks = [self.analyze_abstract(abstracts[i]) for i in pending]
+        else:
+            self._store_batch(abstracts, pending, blocks)
+        
+        for i, block in zip(pending, blocks):
+            results[i] = block
+        return results
+    
+    async def _analyze_batch_async(self, aclient: AsyncOpenAI, abstracts: List[str]) -> List[str]:
+        """Analyze several abstracts with a single request (async)"""
+        results, pending = await self._in_thread(self._lookup_batch, abstracts)
+        
+        if len(pending) <= 1:
+            for i in pending:
+                results[i] = await self._analyze_abstract_async(aclient, abstracts[i])
+            return results
+        
+        try:
+            content = await self._acomplete(
+                aclient,
+                self._batch_messages([abstracts[i] for i in pending]),
+                min(MAX_TOKENS_PER_ABSTRACT * len(pending), MAX_COMPLETION_TOKENS)
+            )
+            blocks = self._split_batch_response(content, len(pending))
+        except Exception as e:
+            print(f"Error analyzing abstract batch: {e}")
+            blocks = []
+        
+        # Fall back to one request per abstract if the response cannot be aligned
+        if len(blocks) != len(pending):
+            blocks = [await self._analyze_abstract_async(aclient, abstracts[i]) for i in pending]
+        else:
+            await self._in_thread(self._store_batch, abstracts, pending, blocks)
+        
+        for i, block in zip(pending, blocks):
+            results[i] = block
+        return results
+    
+    @staticmethod
+    def _split_batch_response(content: str, expected: int) -> List[str]:
+        """Split a batched response into one block per numbered input"""
+        blocks = [block.strip() for block in (content or "").split(BATCH_SEPARATOR)]
+        # A trailing separator leaves one extra empty block; only then is it dropped
+        if len(blocks) == expected + 1 and not blocks[-1]:
+            blocks.pop()
+        blocks = [re.sub(r'^\d+\.\s*', '', block) for block in blocks]
+        return ["" if block.upper() == EMPTY_BLOCK else block for block in blocks]
+    
+    def analyze_single_row(self, index: int, abstract: str, total_rows: int) -> tuple:
+        """Analyze a single row"""
         if pd.isna(abstract) or not abstract:
             result = ""
         else:
             result = self.analyze_abstract(abstract)
         
-        # Update progress
-        with self.lock:
-            self.completed_count += 1
-            progress = (self.completed_count / total_rows) * 100
-            print(f"Row {index+1}/{total_rows}: {result[:50]}..." if result else f"Row {index+1}/{total_rows}: No results")
-            print(f"Progress: {progress:.2f}%\n")
-        
+        self._log_result(index, result)
         return index, result
     
-    def batch_analyze(self, df: pd.DataFrame, start_row: int = 0) -> pd.DataFrame:
-        """Batch analyze article abstracts with optional parallel processing"""
+    @staticmethod
+    def _log_result(index, result: str) -> None:
+        """Log the start of a row's result at DEBUG level"""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Row %s: %s", index + 1, f"{result[:50]}..." if result else "No results")
+    
+    def _chunk_rows(self, rows_to_process: list) -> list:
+        """Group rows into batches of `abstracts_per_request`"""
+        size = max(1, self.config.abstracts_per_request)
+        return [rows_to_process[k:k + size] for k in range(0, len(rows_to_process), size)]
+    
+    def batch_analyze(self, df: pd.DataFrame, start_row: int = 0, overwrite: bool = False,
+                      refresh: bool = False) -> pd.DataFrame:
+        """Batch analyze article abstracts with optional parallel processing
+        
+        Rows that already have an answer are skipped unless overwrite is set.
+        With refresh, every abstract is sent to the LLM even if a cached response exists;
+        the new responses replace the cached ones.
+        """
+        self.refresh_cache = refresh
+        try:
+            return self._batch_analyze(df, start_row, overwrite)
+        finally:
+            self.refresh_cache = False
+    
+    def _batch_analyze(self, df: pd.DataFrame, start_row: int, overwrite: bool) -> pd.DataFrame:
+        """batch_analyze body"""
         if 'Answer to Question 2' not in df.columns:
-            df['Answer to Question 2'] = ""
+            df['Answer to Question 2'] = pd.array([""] * len(df), dtype="string")
         
-        rows_to_process = [(i, row) for i, row in df.iterrows() if i >= start_row]
-        total_rows = len(rows_to_process)
+        answered = (df['Answer to Question 2'].notna() & df['Answer to Question 2'].ne("")).to_numpy()
         
+        rows_to_process = []
+        empty_rows = []
+        for index, abstract, done in zip(df.index[start_row:], df['Abstract'].to_numpy()[start_row:],
+                                         answered[start_row:]):
+            if done and not overwrite:
+                continue
+            if isinstance(abstract, str) and abstract.strip():
+                rows_to_process.append((index, abstract))
+            else:
+                empty_rows.append((index, ""))
+        
+        # Empty abstracts never reach the LLM
+        self._write_results(df, empty_rows)
+        
+        total_rows = len(rows_to_process)
         if total_rows == 0:
             return df
         
@@ -76,48 +334,131 @@ class CausalAnalyzer:
     
     def _batch_analyze_parallel(self, df: pd.DataFrame, rows_to_process: list, total_rows: int) -> pd.DataFrame:
         """Parallel batch analysis"""
-        self.completed_count = 0
-        
-        print(f"Analyzing {total_rows} abstracts with {self.config.max_workers} workers (parallel mode)...")
-        
-        with ThreadPoolExecutor(max_workers=self.config.max_workers) as executor:
-            futures = {
-                executor.submit(self.analyze_single_row, i, row, total_rows): i 
-                for i, row in rows_to_process
-            }
-            
-            for future in as_completed(futures):
-                try:
-                    index, result = future.result()
-                    df.at[index, 'Answer to Question 2'] = result
-                except Exception as e:
-                    index = futures[future]
-                    print(f"Error processing row {index+1}: {e}")
-                    df.at[index, 'Answer to Question 2'] = ""
+        print(f"Analyzing {total_rows} abstracts with {self.config.max_workers} concurrent requests (parallel mode)...")
         
-        return df
+        # Longest abstracts first so short ones backfill while they run
+        rows_to_process = sorted(
+            rows_to_process,
+            key=lambda item: len(item[1]) if isinstance(item[1], str) else 0,
+            reverse=True
+        )
+        
+        results_buf = self._run_coroutine(self._analyze_rows_async(rows_to_process, total_rows))
+        return self._write_results(df, results_buf)
+    
+    async def _analyze_rows_async(self, rows_to_process: list, total_rows: int) -> list:
+        """Analyze all rows on one event loop with `max_workers` concurrent workers"""
+        batches = self._chunk_rows(rows_to_process)
+        pending = iter(batches)
+        results_buf = []
+        
+        # One thread per worker for cache access; this loop is private to the run (see _run_coroutine).
+        # asyncio.run only shuts the default executor down on 3.9+, so it is shut down here
+        executor = ThreadPoolExecutor(max_workers=self.config.max_workers)
+        asyncio.get_running_loop().set_default_executor(executor)
+        
+        try:
+            async with AsyncOpenAI(api_key=self.config.api_key, base_url=self.config.base_url, max_retries=0) as aclient:
+                with tqdm(total=total_rows, desc="Analyzing") as progress:
+                    async def worker():
+                        # Workers pull from a shared iterator, so only max_workers coroutines exist at once
+                        for rows in pending:
+                            indices = [index for index, _ in rows]
+                            try:
+                                results = await self._analyze_batch_async(aclient, [abstract for _, abstract in rows])
+                            except Exception as e:
+                                for index in indices:
+                                    print(f"Error processing row {index+1}: {e}")
+                                results = [""] * len(rows)
+                            
+                            progress.update(len(rows))
+                            for index, result in zip(indices, results):
+                                self._log_result(index, result)
+                            results_buf.extend(zip(indices, results))
+                    
+                    workers = min(self.config.max_workers, len(batches))
+                    await asyncio.gather(*(worker() for _ in range(workers)))
+        finally:
+            executor.shutdown(wait=True)
+        
+        return results_buf
+    
+    @staticmethod
+    def _run_coroutine(coro):
+        """Run a coroutine to completion, even if an event loop is already running (e.g. Jupyter)"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+        
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, coro).result()
     
     def _batch_analyze_sequential(self, df: pd.DataFrame, rows_to_process: list, total_rows: int) -> pd.DataFrame:
         """Sequential batch analysis"""
         print(f"Analyzing {total_rows} abstracts (sequential mode)...")
         
-        for i, (index, row) in enumerate(rows_to_process):
-            result = self.analyze_abstract(row['Abstract'])
-            df.at[index, 'Answer to Question 2'] = result
-            
-            progress = ((i + 1) / total_rows) * 100
-            print(f"Row {index+1}/{total_rows}: {result[:50]}..." if result else f"Row {index+1}/{total_rows}: No results")
-            print(f"Progress: {progress:.2f}%\n")
+        results_buf = []
+        with tqdm(total=total_rows, desc="Analyzing") as progress:
+            for rows in self._chunk_rows(rows_to_process):
+                results = self._analyze_batch([abstract for _, abstract in rows])
+                
+                for (index, _), result in zip(rows, results):
+                    results_buf.append((index, result))
+                    self._log_result(index, result)
+                progress.update(len(rows))
         
+        return self._write_results(df, results_buf)
+    
+    @staticmethod
+    def _write_results(df: pd.DataFrame, results_buf: list) -> pd.DataFrame:
+        """Write all (index, result) pairs into the answer column at once"""
+        if results_buf:
+            indices, values = zip(*results_buf)
+            df.loc[list(indices), 'Answer to Question 2'] = list(values)
         return df
     
+    def _results_path(self, keyword: str, output_dir: str = None) -> str:
+        """Path of the saved analysis results for a keyword"""
+        return os.path.join(output_dir or self.config.output_dir,
+                            self.config.table_filename(self.config.causal_results_pattern, keyword=keyword))
+    
+    def restore_results(self, df: pd.DataFrame, keyword: str, output_dir: str = None) -> int:
+        """Copy answers from previously saved results into df, matched by PMID
+        
+        Returns:
+            int: Number of rows restored
+        """
+        results_file = self._results_path(keyword, output_dir)
+        if not os.path.exists(results_file) or 'PMID' not in df.columns:
+            return 0
+        
+        try:
+            previous = read_dataframe(results_file, self.config.output_format)
+        except Exception as e:
+            print(f"Cannot read saved results {results_file}: {e}. Re-analyzing all abstracts.")
+            return 0
+        
+        if 'PMID' not in previous.columns or 'Answer to Question 2' not in previous.columns:
+            return 0
+        
+        answers = previous.dropna(subset=['Answer to Question 2'])
+        answers = dict(zip(answers['PMID'].astype(str), answers['Answer to Question 2']))
+        restored = df['PMID'].astype(str).map(answers).fillna("")
+        df['Answer to Question 2'] = pd.array(restored, dtype="string")
+        
+        # Rows saved with an empty answer had nothing to restore
+        count = int(restored.astype(str).ne("").sum())
+        print(f"Restored {count} analyzed rows from: {results_file}")
+        return count
+    
     def save_results(self, df: pd.DataFrame, keyword: str, output_dir: str = None) -> str:
         """Save analysis results"""
         output_dir = output_dir or self.config.output_dir
         os.makedirs(output_dir, exist_ok=True)
         
-        output_file = os.path.join(output_dir, self.config.causal_results_pattern.format(keyword=keyword))
-        df.to_excel(output_file, index=False)
+        output_file = self._results_path(keyword, output_dir)
+        write_dataframe(df, output_file, self.config.output_format)
         print(f"Results saved to: {output_file}")
         return output_file
     
@@ -128,7 +469,7 @@ class CausalAnalyzer:
             return {"error": f"Column '{column}' does not exist"}
         
         total = len(df)
-        analyzed = len(df[df[column].notna() & (df[column] != "")])
+        analyzed = int((df[column].notna() & df[column].ne("")).sum())
         
         return {
             "total_articles": total,
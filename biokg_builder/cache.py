@@ -0,0 +1,222 @@
+"""Local Caching Module"""
+
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from .embeddings import load_sentence_model
+
+
+class SQLiteCache:
+    """Thread-safe key-value store backed by a local SQLite file"""
+
+    def __init__(self, path: str, table: str = "cache"):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.table = table
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value)")
+            self.conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a value, or None if the key is missing"""
+        with self.lock:
+            row = self.conn.execute(f"SELECT value FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: Any) -> None:
+        """Insert or replace a value"""
+        with self.lock:
+            self.conn.execute(f"INSERT OR REPLACE INTO {self.table} (key, value) VALUES (?, ?)", (key, value))
+            self.conn.commit()
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Get the stored values for keys; missing keys are left out"""
+        found = {}
+        with self.lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                found.update(self.conn.execute(
+                    f"SELECT key, value FROM {self.table} WHERE key IN ({placeholders})", chunk
+                ).fetchall())
+        return found
+    
+    def set_many(self, items: List[Tuple[str, Any]]) -> None:
+        """Insert or replace several values in one transaction"""
+        with self.lock:
+            self.conn.executemany(f"INSERT OR REPLACE INTO {self.table} (key, value) VALUES (?, ?)", items)
+            self.conn.commit()
+    
+    def items(self, prefix: str = "") -> List[Tuple[str, Any]]:
+        """List all (key, value) pairs whose key starts with prefix"""
+        with self.lock:
+            return self.conn.execute(
+                f"SELECT key, value FROM {self.table} WHERE substr(key, 1, ?) = ?",
+                (len(prefix), prefix)
+            ).fetchall()
+
+    def close(self) -> None:
+        """Close the underlying connection"""
+        with self.lock:
+            self.conn.close()
+
+
+class LLMCache:
+    """Exact and (optionally) semantic cache for LLM responses"""
+
+    def __init__(self, path: str, similarity_threshold: float = 0.8, model_path: str = None):
+        """
+        Initialize cache
+
+        Args:
+            path: SQLite file path
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+            model_path: Sentence embedding model; semantic lookups are disabled if None
+        """
+        self.responses = SQLiteCache(path, table="responses")
+        self.embeddings = SQLiteCache(path, table="embeddings") if model_path else None
+        self.similarity_threshold = similarity_threshold
+        self.model_path = model_path
+        self.model = None
+        self.lock = threading.Lock()
+        self._vectors: Dict[str, Tuple[List[str], np.ndarray]] = {}
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict[str, str]]) -> str:
+        """SHA-256 of the model and messages"""
+        payload = json.dumps([model, messages], ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _scope(model: str, messages: List[Dict[str, str]]) -> str:
+        """Semantic hits are only allowed between requests sharing model and system prompt"""
+        system = [m["content"] for m in messages if m["role"] == "system"]
+        return hashlib.sha256(json.dumps([model, system]).encode('utf-8')).hexdigest()[:16]
+
+    def get(self, model: str, messages: List[Dict[str, str]]) -> Optional[str]:
+        """Look up a cached response"""
+        key = self.make_key(model, messages)
+        content = self.responses.get(key)
+        if content is not None or self.embeddings is None:
+            return content
+
+        vector = self._embed(messages[-1]["content"])
+        if vector is None:
+            return None
+
+        keys, matrix = self._load_vectors(self._scope(model, messages))
+        if not keys:
+            return None
+
+        similarities = matrix @ vector
+        best = int(np.argmax(similarities))
+        if similarities[best] > self.similarity_threshold:
+            return self.responses.get(keys[best])
+        return None
+
+    def set(self, model: str, messages: List[Dict[str, str]], content: str) -> None:
+        """Store a response"""
+        key = self.make_key(model, messages)
+        self.responses.set(key, content)
+
+        if self.embeddings is None:
+            return
+
+        vector = self._embed(messages[-1]["content"])
+        if vector is None:
+            return
+
+        scope = self._scope(model, messages)
+        self.embeddings.set(f"{scope}/{key}", vector.tobytes())
+        with self.lock:
+            if scope in self._vectors:
+                keys, matrix = self._vectors[scope]
+                matrix = np.vstack([matrix, vector]) if keys else vector[None, :]
+                self._vectors[scope] = (keys + [key], matrix)
+
+    def _load_vectors(self, scope: str) -> Tuple[List[str], np.ndarray]:
+        """Load stored embeddings for a scope into memory"""
+        with self.lock:
+            if scope not in self._vectors:
+                rows = self.embeddings.items(prefix=f"{scope}/")
+                keys = [k.split("/", 1)[1] for k, _ in rows]
+                vectors = [np.frombuffer(v, dtype=np.float32) for _, v in rows]
+                matrix = np.vstack(vectors) if vectors else np.empty((0, 0), dtype=np.float32)
+                self._vectors[scope] = (keys, matrix)
+            return self._vectors[scope]
+
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        """Normalized embedding of text, or None if the model is unavailable"""
+        with self.lock:
+            if self.model is None:
+                try:
+                    self.model = load_sentence_model(self.model_path)
+                except Exception as e:
+                    print(f"Cannot load model: {e}. Semantic cache disabled.")
+                    self.embeddings = None
+                    return None
+        vector = self.model.encode([text], normalize_embeddings=True)[0]
+        return np.asarray(vector, dtype=np.float32)
+
+    def close(self) -> None:
+        """Close the underlying stores"""
+        self.responses.close()
+        if self.embeddings is not None:
+            self.embeddings.close()
+
+
+class EmbeddingCache:
+    """Disk and memory cache of text embeddings, stored as float16"""
+    
+    def __init__(self, path: str, namespace: str):
+        """
+        Initialize cache
+        
+        Args:
+            path: SQLite file path
+            namespace: Identifies the model and encoding settings; vectors are never shared across namespaces
+        """
+        self.store = SQLiteCache(path, table="embeddings")
+        self.namespace = namespace
+        self.memory: Dict[str, np.ndarray] = {}
+    
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.namespace}\0{text}".encode('utf-8')).hexdigest()
+    
+    def encode(self, texts: List[str], encode_fn) -> np.ndarray:
+        """
+        Embeddings for texts, calling encode_fn only for texts not cached yet
+        
+        Args:
+            texts: Texts to embed
+            encode_fn: Maps a list of texts to a (len, dim) array
+            
+        Returns:
+            np.ndarray: (len(texts), dim) float32 matrix
+        """
+        keys = [self._key(text) for text in texts]
+        
+        missing = [key for key in dict.fromkeys(keys) if key not in self.memory]
+        if missing:
+            for key, value in self.store.get_many(missing).items():
+                self.memory[key] = np.frombuffer(value, dtype=np.float16)
+        
+        misses = {key: text for key, text in zip(keys, texts) if key not in self.memory}
+        if misses:
+            vectors = np.asarray(encode_fn(list(misses.values())), dtype=np.float16)
+            self.store.set_many([(key, vector.tobytes()) for key, vector in zip(misses, vectors)])
+            self.memory.update(zip(misses, vectors))
+        
+        return np.vstack([self.memory[key] for key in keys]).astype(np.float32)
+    
+    def close(self) -> None:
+        """Close the underlying store"""
+        self.store.close()
@@ -4,9 +4,9 @@ import argparse
 import sys
 import os
 import json
-from . import BioKGBuilder, __version__
+from . import __version__
 from .config import Config
-from .utils import validate_email, validate_api_key
+from .utils import validate_email, validate_api_key, write_dataframe, DATAFRAME_EXTENSIONS
 
 
 def main():
@@ -36,6 +36,7 @@ Examples:
     build_parser.add_argument('--output-dir', '-o', default='output', help='Output directory')
     build_parser.add_argument('--exclude', nargs='+', help='Entities to exclude')
     build_parser.add_argument('--depth', type=int, default=1, help='Network search depth')
+    build_parser.add_argument('--force', action='store_true', help='Re-analyze all abstracts, ignoring saved results and cached LLM responses')
     
     # config command
     config_parser = subparsers.add_parser('config', help='Manage configuration')
@@ -53,6 +54,8 @@ Examples:
     search_parser.add_argument('--email', '-e', help='PubMed email address')
     search_parser.add_argument('--max-results', '-m', type=int, default=200, help='Maximum search results')
     search_parser.add_argument('--output', '-o', help='Output file path')
+    search_parser.add_argument('--format', '-f', choices=list(DATAFRAME_EXTENSIONS),
+                               help='Output file format (default: from the --output extension, else parquet)')
     
     args = parser.parse_args()
     
@@ -122,9 +125,15 @@ def handle_config_command(args):
 
 def handle_build_command(args):
     """Handle build command"""
+    from .core import BioKGBuilder
+    
     # Determine configuration source
     if args.config and os.path.exists(args.config):
-        builder = BioKGBuilder(config_path=args.config)
+        try:
+            builder = BioKGBuilder(config_path=args.config)
+        except ValueError as e:
+            print(f"Error: Invalid configuration: {e}")
+            sys.exit(1)
     else:
         # Create from command line arguments
         email = args.email or os.getenv('BIOKG_EMAIL')
@@ -143,7 +152,11 @@ def handle_build_command(args):
             print("Error: Invalid API key")
             sys.exit(1)
         
-        builder = BioKGBuilder(email=email, api_key=api_key)
+        try:
+            builder = BioKGBuilder(email=email, api_key=api_key)
+        except ValueError as e:
+            print(f"Error: Invalid configuration: {e}")
+            sys.exit(1)
     
     # Set output directory
     builder.config.output_dir = args.output_dir
@@ -156,7 +169,8 @@ def handle_build_command(args):
             keyword=args.keyword,
             max_results=args.max_results,
             exclude_entities=args.exclude,
-            depth=args.depth
+            depth=args.depth,
+            force=args.force
         )
         
         print("\nBuild successful!")
@@ -175,6 +189,23 @@ def handle_build_command(args):
         sys.exit(1)
 
 
+def resolve_output_format(output_path, output_format):
+    """Pick the table format from --format and the --output extension, exiting on a conflict"""
+    if not output_path:
+        return output_format or 'parquet'
+    
+    ext = os.path.splitext(output_path)[1].lstrip('.').lower()
+    inferred = {extension: fmt for fmt, extension in DATAFRAME_EXTENSIONS.items()}.get(ext)
+    
+    if output_format and inferred and output_format != inferred:
+        print(f"Error: --format {output_format} does not match output file extension '.{ext}'")
+        sys.exit(1)
+    if not output_format and not inferred:
+        print(f"Error: Cannot infer the output format from '{output_path}'; use --format")
+        sys.exit(1)
+    return output_format or inferred
+
+
 def handle_search_command(args):
     """Handle search command"""
     email = args.email or os.getenv('BIOKG_EMAIL')
@@ -190,6 +221,15 @@ def handle_search_command(args):
     # Create configuration
     config = Config()
     config.email = email
+    # A one-off search has no output directory to keep an article cache in
+    config.use_cache = False
+    try:
+        config.validate(require_api=False)
+    except ValueError as e:
+        print(f"Error: Invalid configuration: {e}")
+        sys.exit(1)
+    
+    output_format = resolve_output_format(args.output, args.format)
     
     # Create searcher
     from .searcher import PubMedSearcher
@@ -208,8 +248,8 @@ def handle_search_command(args):
         import pandas as pd
         df = pd.DataFrame(articles)
         
-        output_path = args.output or f"{args.keyword}_search_results.xlsx"
-        df.to_excel(output_path, index=False)
+        output_path = args.output or f"{args.keyword}_search_results.{DATAFRAME_EXTENSIONS[output_format]}"
+        write_dataframe(df, output_path, output_format)
         print(f"Results saved to: {output_path}")
         
         # Show first few articles
@@ -3,7 +3,44 @@
 import os
 import json
 from dataclasses import dataclass, field
+from string import Template
 from typing import Optional, Dict, Any
+from urllib.parse import urlparse
+from .utils.helpers import DATAFRAME_EXTENSIONS
+
+
+# Pyvis options; only the node font color varies between configurations
+_NETWORK_OPTIONS_TEMPLATE = Template("""
+        {
+          "physics": {
+            "barnesHut": {
+              "gravitationalConstant": -80000,
+              "centralGravity": 0.5,
+              "springLength": 75,
+              "springConstant": 0.05,
+              "damping": 0.09,
+              "avoidOverlap": 0.5
+            },
+            "maxVelocity": 100,
+            "minVelocity": 0.1,
+            "solver": "barnesHut",
+            "timestep": 0.3,
+            "stabilization": {
+                "enabled": true,
+                "iterations": 500,
+                "updateInterval": 10,
+                "onlyDynamicEdges": false,
+                "fit": true
+            }
+          },
+          "nodes": {
+            "font": {
+              "size": 30,
+              "color": "$font_color"
+            }
+          }
+        }
+        """)
 
 
 @dataclass
@@ -23,12 +60,26 @@ class Config:
     
     # Search Configuration
     max_results: int = 200
+    fetch_batch_size: int = 200  # PMIDs per efetch request
+    fetch_workers: int = 3  # Concurrent efetch requests (NCBI allows 3/s without an API key)
     
     # Processing Configuration
     similarity_threshold: float = 0.8
-    chunk_size: int = 30000
+    use_numba: bool = False  # Compare entity embeddings with a parallel Numba kernel (requires numba)
+    quantize_embeddings: bool = False  # Compare int8-quantized entity embeddings (requires simsimd)
+    use_ann: bool = False  # Only compare each entity with its nearest neighbors in an HNSW index (requires usearch)
+    ann_neighbors: int = 10  # Neighbors checked per entity when use_ann is set
+    chunk_size: int = 30000  # Maximum entities listed in the summary prompt
+    summary_max_input_tokens: int = 6000  # Token budget for the entity list in the summary prompt
     max_workers: int = 10  # For parallel processing
     use_parallel: bool = True  # Enable/disable parallel processing
+    abstracts_per_request: int = 5  # Abstracts sent together in one LLM request
+    requests_per_minute: int = 300  # Shared LLM request budget across all components
+    max_retries: int = 6  # Retries on rate-limit, timeout and server errors
+    
+    # Cache Configuration
+    use_cache: bool = True  # Reuse LLM responses, fetched articles and entity embeddings stored under output_dir
+    semantic_cache: bool = False  # Also reuse responses for near-duplicate inputs (requires sentence_model_path)
     
     # Network Visualization Configuration
     network_height: str = "2160px"
@@ -38,6 +89,8 @@ class Config:
     
     # Output Configuration
     output_dir: str = "output"
+    output_format: str = "parquet"  # Table format: parquet, feather, excel or csv
+    compress_json: bool = True  # Write the JSON results gzip-compressed
     
     # System Prompts
     causal_analysis_prompt: str = (
@@ -50,16 +103,74 @@ class Config:
         "The output strictly follows the format: (Entity A, Entity B), with no additional text."
     )
     
+    batch_analysis_prompt: str = (
+        "The input contains several numbered abstracts separated by '---'. "
+        "Analyze each abstract independently and emit one block per numbered input, "
+        "in the same order, with blocks separated by a line containing only '###'. "
+        "If an abstract contains no causal relationships, its block must be exactly NONE."
+    )
+    
     summary_prompt: str = "You are a professional biomedical research analyst."
     
     # File naming patterns
-    search_results_pattern: str = "{keyword}_pubmed_search_results.xlsx"
-    causal_results_pattern: str = "updated_{keyword}_causal.xlsx"
-    processed_results_pattern: str = "processed_{keyword}.xlsx"
+    search_results_pattern: str = "{keyword}_pubmed_search_results.{ext}"
+    causal_results_pattern: str = "updated_{keyword}_causal.{ext}"
+    processed_results_pattern: str = "processed_{keyword}.{ext}"
     full_network_pattern: str = "{keyword}_full_network.html"
     filtered_network_pattern: str = "{keyword}_filtered_{search_keyword}_network.html"
     report_pattern: str = "{keyword}_analysis_report"
     json_results_pattern: str = "{keyword}_results.json"
+    llm_cache_file: str = ".llm_cache.sqlite"
+    pubmed_cache_file: str = ".pubmed_cache.sqlite"
+    embedding_cache_file: str = ".embedding_cache.sqlite"
+    
+    def validate(self, require_api: bool = True) -> None:
+        """
+        Check settings needed before any work starts; raise ValueError on the first problem
+        
+        Not run on construction, so a config can be created or loaded with gaps and completed
+        afterwards. Call it once all overrides are applied.
+        
+        Args:
+            require_api: Also check the LLM API settings (not needed for PubMed-only commands)
+        """
+        if require_api:
+            if not self.api_key or not self.api_key.strip():
+                raise ValueError("api_key is required")
+            
+            url = urlparse(self.base_url or "")
+            if url.scheme not in ("http", "https") or not url.netloc:
+                raise ValueError(f"base_url must be an http(s) URL, got {self.base_url!r}")
+        
+        if self.max_workers <= 0:
+            raise ValueError(f"max_workers must be positive, got {self.max_workers}")
+        if self.abstracts_per_request <= 0:
+            raise ValueError(f"abstracts_per_request must be positive, got {self.abstracts_per_request}")
+        if self.requests_per_minute <= 0:
+            raise ValueError(f"requests_per_minute must be positive, got {self.requests_per_minute}")
+        if self.max_retries < 0:
+            raise ValueError(f"max_retries must not be negative, got {self.max_retries}")
+        if self.fetch_batch_size <= 0:
+            raise ValueError(f"fetch_batch_size must be positive, got {self.fetch_batch_size}")
+        if self.fetch_workers <= 0:
+            raise ValueError(f"fetch_workers must be positive, got {self.fetch_workers}")
+        if not 0.0 <= self.similarity_threshold <= 1.0:
+            raise ValueError(f"similarity_threshold must be between 0 and 1, got {self.similarity_threshold}")
+        if self.output_format not in DATAFRAME_EXTENSIONS:
+            raise ValueError(
+                f"output_format must be one of {', '.join(DATAFRAME_EXTENSIONS)}, got {self.output_format!r}"
+            )
+    
+    def table_filename(self, pattern: str, **fields) -> str:
+        """
+        File name from a table naming pattern, always ending in the extension of output_format
+        
+        Any extension in the pattern itself is replaced, so patterns saved by older versions
+        with a fixed suffix such as .xlsx still name the file after the format actually written.
+        """
+        ext = DATAFRAME_EXTENSIONS[self.output_format]
+        stem = os.path.splitext(pattern)[0]
+        return f"{stem.format(ext=ext, **fields)}.{ext}"
     
     @classmethod
     def from_file(cls, config_path: str) -> 'Config':
@@ -76,34 +187,4 @@ class Config:
     
     def get_network_options(self) -> str:
         """Get network visualization options"""
-        return f"""
-        {{
-          "physics": {{
-            "barnesHut": {{
-              "gravitationalConstant": -80000,
-              "centralGravity": 0.5,
-              "springLength": 75,
-              "springConstant": 0.05,
-              "damping": 0.09,
-              "avoidOverlap": 0.5
-            }},
-            "maxVelocity": 100,
-            "minVelocity": 0.1,
-            "solver": "barnesHut",
-            "timestep": 0.3,
-            "stabilization": {{
-                "enabled": true,
-                "iterations": 500,
-                "updateInterval": 10,
-                "onlyDynamicEdges": false,
-                "fit": true
-            }}
-          }},
-          "nodes": {{
-            "font": {{
-              "size": 30,
-              "color": "{self.network_font_color}"
-            }}
-          }}
-        }}
-        """
\ No newline at end of file
+        return _NETWORK_OPTIONS_TEMPLATE.substitute(font_color=self.network_font_color)
\ No newline at end of file
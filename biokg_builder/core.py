@@ -41,6 +41,7 @@ class BioKGBuilder:
             self.config.base_url = base_url
         if use_parallel is not None:
             self.config.use_parallel = use_parallel
+        self.config.validate()
         
         # Initialize components
         self.searcher = PubMedSearcher(self.config)
@@ -51,7 +52,8 @@ class BioKGBuilder:
     
     def build_knowledge_graph(self, keyword: str, max_results: int = None,
                             exclude_entities: List[str] = None,
-                            depth: int = 1, use_parallel: bool = None) -> Dict[str, Any]:
+                            depth: int = 1, use_parallel: bool = None,
+                            force: bool = False) -> Dict[str, Any]:
         """
         Build knowledge graph from PubMed literature
         
@@ -61,6 +63,7 @@ class BioKGBuilder:
             exclude_entities: Entities to exclude
             depth: Network search depth
             use_parallel: Override parallel processing setting
+            force: Re-analyze all abstracts, ignoring saved causal results and cached LLM responses
         """
         print(f"\n=== Building knowledge graph for '{keyword}' ===\n")
         
@@ -84,7 +87,9 @@ class BioKGBuilder:
             
             # 2. Analyze causal relationships
             print("\nStep 2: Analyzing causal relationships...")
-            df = self.analyzer.batch_analyze(df)
+            if not force:
+                self.analyzer.restore_results(df, keyword)
+            df = self.analyzer.batch_analyze(df, overwrite=force, refresh=force)
             causal_file = self.analyzer.save_results(df, keyword)
             results['files']['causal_analysis'] = causal_file
             
@@ -0,0 +1,192 @@
+"""Sentence Embedding Helpers"""
+
+from functools import lru_cache
+import importlib.util
+import numpy as np
+
+
+def backend_available(name: str) -> bool:
+    """Whether an optional similarity backend (numba, simsimd, usearch) is installed, without importing it"""
+    return importlib.util.find_spec(name) is not None
+
+
+def select_device() -> str:
+    """Best available torch device: cuda, then mps, then cpu"""
+    import torch
+    
+    if torch.cuda.is_available():
+        return "cuda"
+    if getattr(torch.backends, "mps", None) is not None and torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
+
+
+@lru_cache(maxsize=4)
+def load_sentence_model(model_path: str, max_seq_length: int = None):
+    """
+    Process-wide SentenceTransformer per (model path, max_seq_length), placed on the best device
+    and run in half precision there
+    
+    Args:
+        model_path: Model name or local path
+        max_seq_length: Truncate inputs to this many tokens; short inputs such as entity names
+            need far less than the model default, and shorter sequences mean less padding
+    """
+    from sentence_transformers import SentenceTransformer
+    
+    device = select_device()
+    model = SentenceTransformer(model_path, device=device)
+    if device != "cpu":
+        model.half()
+    if max_seq_length:
+        model.max_seq_length = min(model.max_seq_length, max_seq_length)
+    return model
+
+
+@lru_cache(maxsize=1)
+def _similar_pairs_kernel():
+    """Compile the Numba kernel on first use, so numba is only imported when it is selected"""
+    from numba import njit, prange
+    
+    @njit(parallel=True, cache=True)
+    def kernel(embeddings, threshold):
+        n, dim = embeddings.shape
+        
+        # First pass: count matches per row so the output can be filled in parallel
+        counts = np.zeros(n, dtype=np.int64)
+        for i in prange(n):
+            count = 0
+            for j in range(i + 1, n):
+                dot = 0.0
+                for k in range(dim):
+                    dot += embeddings[i, k] * embeddings[j, k]
+                if dot > threshold:
+                    count += 1
+            counts[i] = count
+        
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(counts)
+        pairs = np.empty((offsets[n], 2), dtype=np.int64)
+        
+        for i in prange(n):
+            pos = offsets[i]
+            for j in range(i + 1, n):
+                dot = 0.0
+                for k in range(dim):
+                    dot += embeddings[i, k] * embeddings[j, k]
+                if dot > threshold:
+                    pairs[pos, 0] = i
+                    pairs[pos, 1] = j
+                    pos += 1
+        return pairs
+    
+    return kernel
+
+
+def numba_similar_pairs(embeddings, threshold: float, num_threads: int = None) -> np.ndarray:
+    """
+    Index pairs (i, j), i < j, whose cosine similarity exceeds threshold,
+    computed with a parallel Numba kernel
+    
+    Args:
+        embeddings: (n, dim) embedding matrix
+        threshold: Cosine similarity threshold
+        num_threads: Numba worker threads
+        
+    Returns:
+        np.ndarray: (m, 2) array of index pairs
+    """
+    import numba
+    
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    embeddings = np.ascontiguousarray(embeddings / np.maximum(norms, 1e-12))
+    
+    if num_threads:
+        numba.set_num_threads(min(num_threads, numba.config.NUMBA_NUM_THREADS))
+    return _similar_pairs_kernel()(embeddings, np.float32(threshold))
+
+
+def quantize_int8(embeddings) -> np.ndarray:
+    """Symmetric per-row int8 quantization; cosine similarity is preserved up to rounding"""
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    scale = np.max(np.abs(embeddings), axis=1, keepdims=True) / 127.0
+    return np.round(embeddings / np.maximum(scale, 1e-12)).astype(np.int8)
+
+
+def simsimd_similar_pairs(embeddings, threshold: float, num_threads: int = None,
+                          block_size: int = 4096, quantize: bool = False) -> np.ndarray:
+    """
+    Index pairs (i, j), i < j, whose cosine similarity exceeds threshold,
+    computed with SimSIMD's SIMD cosine distance kernels
+    
+    Args:
+        embeddings: (n, dim) embedding matrix
+        threshold: Cosine similarity threshold
+        num_threads: SimSIMD worker threads
+        block_size: Rows compared per cdist call, bounding memory to block_size * n
+        quantize: Compare int8-quantized vectors instead of float32
+        
+    Returns:
+        np.ndarray: (m, 2) array of index pairs
+    """
+    import simsimd
+    
+    if quantize:
+        embeddings = np.ascontiguousarray(quantize_int8(embeddings))
+    else:
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    n = len(embeddings)
+    pairs = []
+    for start in range(0, n, block_size):
+        distances = np.asarray(simsimd.cdist(
+            embeddings[start:start + block_size], embeddings,
+            metric="cosine", threads=num_threads or 1
+        ))
+        rows, cols = np.nonzero(1.0 - distances > threshold)
+        rows += start
+        upper = cols > rows
+        pairs.append(np.column_stack([rows[upper], cols[upper]]))
+    return np.concatenate(pairs) if pairs else np.empty((0, 2), dtype=np.int64)
+
+
+def usearch_similar_pairs(embeddings, threshold: float, neighbors: int = 10,
+                          num_threads: int = None) -> np.ndarray:
+    """
+    Index pairs (i, j), i < j, whose cosine similarity exceeds threshold, found by querying
+    each vector's nearest neighbors in a USearch HNSW index
+    
+    Approximate: a pair is only found if one side is among the other's top neighbors.
+    
+    Args:
+        embeddings: (n, dim) embedding matrix
+        threshold: Cosine similarity threshold
+        neighbors: Neighbors retrieved per vector (excluding itself)
+        num_threads: USearch worker threads
+        
+    Returns:
+        np.ndarray: (m, 2) array of index pairs, sorted
+    """
+    from usearch.index import Index
+    
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    n = len(embeddings)
+    if n < 2:
+        return np.empty((0, 2), dtype=np.int64)
+    threads = num_threads or 0
+    
+    index = Index(ndim=embeddings.shape[1], metric="cos")
+    index.add(np.arange(n), embeddings, threads=threads)
+    count = min(neighbors + 1, n)
+    matches = index.search(embeddings, count, threads=threads)
+    
+    keys = np.asarray(matches.keys).reshape(n, -1)
+    distances = np.asarray(matches.distances).reshape(n, -1)
+    found = np.arange(keys.shape[1])[None, :] < np.asarray(matches.counts).reshape(n, 1)
+    mask = found & (1.0 - distances > threshold)
+    
+    rows = np.broadcast_to(np.arange(n)[:, None], keys.shape)[mask]
+    cols = keys[mask].astype(np.int64)
+    pairs = np.column_stack([np.minimum(rows, cols), np.maximum(rows, cols)])
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+    return np.unique(pairs, axis=0) if len(pairs) else np.empty((0, 2), dtype=np.int64)
@@ -1,19 +1,85 @@
 """Report Generation Module"""
 
 from typing import List, Dict, Any
-from openai import OpenAI
+from functools import lru_cache
 from .config import Config
+from .cache import LLMCache
+from .llm import get_openai_client, get_rate_limiter, call_with_retry
 import os
 import json
+import gzip
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _to_list(obj: Any) -> Any:
+    return obj.tolist()
+
+
+# type -> converter for values the JSON encoder cannot serialize; extended on first sight of a type
+_JSON_HANDLERS = {
+    set: list,
+    frozenset: list,
+}
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(model: str):
+    """tiktoken encoding for a model, or None if tiktoken is not installed"""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
 
 class ReportGenerator:
     """Report Generation Class"""
     
     def __init__(self, config: Config):
         self.config = config
-        self.client = OpenAI(api_key=config.api_key, base_url=config.base_url)
+        self.client = get_openai_client(config.api_key, config.base_url, config.max_workers * 2)
+        self.limiter = get_rate_limiter(config.requests_per_minute)
+        self.cache = None
+    
+    def _get_cache(self):
+        """Lazy open the LLM response cache"""
+        if self.cache is None and self.config.use_cache:
+            self.cache = LLMCache(
+                os.path.join(self.config.output_dir, self.config.llm_cache_file),
+                similarity_threshold=self.config.similarity_threshold,
+                model_path=self.config.sentence_model_path if self.config.semantic_cache else None
+            )
+        return self.cache
+    
+    def _cached_complete(self, messages: list, max_tokens: int) -> str:
+        """Chat completion served from the cache when possible"""
+        cache = self._get_cache()
+        if cache:
+            content = cache.get(self.config.llm_model, messages)
+            if content is not None:
+                return content
+        
+        response = call_with_retry(
+            self.client.chat.completions.create,
+            limiter=self.limiter,
+            max_retries=self.config.max_retries,
+            model=self.config.llm_model,
+            messages=messages,
+            max_tokens=max_tokens
+        )
+        content = response.choices[0].message.content
+        
+        if cache:
+            cache.set(self.config.llm_model, messages, content)
+        return content
     
     def generate_summary(self, node_names: List[str], keyword: str) -> str:
         """Generate AI summary of entities"""
@@ -21,9 +87,11 @@ class ReportGenerator:
             return "No relevant nodes found."
         
         # Prepare entity list
-        entities_text = ", ".join(node_names[:self.config.chunk_size])
-        if len(node_names) > self.config.chunk_size:
+        selected = self._truncate_by_tokens(node_names[:self.config.chunk_size])
+        entities_text = ", ".join(selected)
+        if len(node_names) > len(selected):
             entities_text += "..."
+            print(f"Summary limited to {len(selected)} of {len(node_names)} entities")
         
         prompt = (
             f"List of biomedical entities related to '{keyword}':\n"
@@ -33,19 +101,30 @@ class ReportGenerator:
         )
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.config.llm_model,
-                messages=[
-                    {"role": "system", "content": self.config.summary_prompt},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=2048
-            )
-            return response.choices[0].message.content
+            return self._cached_complete([
+                {"role": "system", "content": self.config.summary_prompt},
+                {"role": "user", "content": prompt}
+            ], max_tokens=2048)
         except Exception as e:
             print(f"Error generating summary: {e}")
             return "Failed to generate summary."
     
+    def _truncate_by_tokens(self, node_names: List[str]) -> List[str]:
+        """Keep leading entities until the summary token budget is reached"""
+        encoding = _get_encoding(self.config.llm_model)
+        budget = self.config.summary_max_input_tokens
+        
+        selected = []
+        used = 0
+        for name in node_names:
+            # One extra token for the ", " separator; ~4 characters per token without tiktoken
+            tokens = (len(encoding.encode(name)) if encoding else len(name) // 4) + 1
+            if used + tokens > budget:
+                break
+            selected.append(name)
+            used += tokens
+        return selected
+    
     def generate_full_report(self, results: Dict[str, Any], keyword: str) -> str:
         """Generate analysis report"""
         report_content = f"""# {keyword} Knowledge Graph Analysis Report
@@ -82,27 +161,37 @@ class ReportGenerator:
         return report_path
     
     def save_results_json(self, results: Dict[str, Any], keyword: str) -> str:
-        """Save results as JSON"""
+        """Save results as JSON (gzip-compressed if `compress_json` is set)"""
         output_dir = self.config.output_dir
         os.makedirs(output_dir, exist_ok=True)
         
         json_path = os.path.join(output_dir, self.config.json_results_pattern.format(keyword=keyword))
+        opener = open
+        if self.config.compress_json:
+            json_path += ".gz"
+            opener = gzip.open
         
-        # Convert to serializable format
-        serializable = self._make_serializable(results)
-        
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(serializable, f, ensure_ascii=False, indent=2)
+        # Serialize in a single pass; non-native types are converted on the fly
+        if orjson is not None:
+            data = orjson.dumps(
+                results,
+                default=self._json_default,
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2
+            )
+            with opener(json_path, 'wb') as f:
+                f.write(data)
+        else:
+            with opener(json_path, 'wt', encoding='utf-8') as f:
+                json.dump(results, f, ensure_ascii=False, indent=2, default=self._json_default)
         
         return json_path
     
-    def _make_serializable(self, obj: Any) -> Any:
-        """Convert object to JSON-serializable format"""
-        if isinstance(obj, (str, int, float, bool, type(None))):
-            return obj
-        elif isinstance(obj, dict):
-            return {k: self._make_serializable(v) for k, v in obj.items()}
-        elif isinstance(obj, (list, tuple)):
-            return [self._make_serializable(item) for item in obj]
-        else:
-            return str(obj)
\ No newline at end of file
+    @staticmethod
+    def _json_default(obj: Any) -> Any:
+        """Convert objects the JSON encoder does not handle natively"""
+        handler = _JSON_HANDLERS.get(type(obj))
+        if handler is None:
+            # Resolve once per type: NumPy scalars/arrays expose tolist(), anything else becomes str
+            handler = _to_list if hasattr(obj, 'tolist') else str
+            _JSON_HANDLERS[type(obj)] = handler
+        return handler(obj)
@@ -0,0 +1,113 @@
+"""LLM Request Helpers"""
+
+import time
+import random
+import asyncio
+import threading
+import importlib.util
+from functools import lru_cache
+import httpx
+import openai
+
+
+# Errors worth retrying: throttling, timeouts, dropped connections and 5xx responses
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+@lru_cache(maxsize=None)
+def get_http_client(max_connections: int) -> httpx.Client:
+    """Process-wide connection pool shared by all OpenAI clients"""
+    return httpx.Client(
+        http2=importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections
+        ),
+        timeout=httpx.Timeout(600.0, connect=5.0),
+        follow_redirects=True
+    )
+
+
+@lru_cache(maxsize=4)
+def get_openai_client(api_key: str, base_url: str, max_connections: int = 20) -> openai.OpenAI:
+    """Process-wide OpenAI client per (api_key, base_url)"""
+    return openai.OpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        max_retries=0,
+        http_client=get_http_client(max_connections)
+    )
+
+
+class RateLimiter:
+    """Token-bucket rate limiter shared by threads and coroutines"""
+
+    def __init__(self, requests_per_minute: int, burst: int = 1):
+        """
+        Initialize rate limiter
+
+        Args:
+            requests_per_minute: Sustained request rate
+            burst: Number of requests allowed back-to-back before throttling
+        """
+        self.interval = 60.0 / requests_per_minute
+        self.burst = max(1, burst)
+        self.lock = threading.Lock()
+        self.next_slot = 0.0
+
+    def _reserve(self) -> float:
+        """Reserve the next slot and return how long to wait for it"""
+        with self.lock:
+            now = time.monotonic()
+            start = max(self.next_slot, now)
+            self.next_slot = start + self.interval
+            return max(0.0, start - now - (self.burst - 1) * self.interval)
+
+    def acquire(self) -> None:
+        """Block until a request may be sent"""
+        time.sleep(self._reserve())
+
+    async def acquire_async(self) -> None:
+        """Wait until a request may be sent without blocking the event loop"""
+        await asyncio.sleep(self._reserve())
+
+
+@lru_cache(maxsize=None)
+def get_rate_limiter(requests_per_minute: int) -> RateLimiter:
+    """Process-wide limiter, shared by every component using the same rate"""
+    return RateLimiter(requests_per_minute, burst=max(1, requests_per_minute // 60))
+
+
+def _backoff(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """Jittered exponential backoff delay in seconds"""
+    return random.uniform(base, min(cap, base * 2 ** attempt))
+
+
+def call_with_retry(func, *args, limiter: RateLimiter = None, max_retries: int = 6, **kwargs):
+    """Call func through the rate limiter, retrying transient API errors"""
+    for attempt in range(max_retries + 1):
+        if limiter:
+            limiter.acquire()
+        try:
+            return func(*args, **kwargs)
+        except RETRYABLE_ERRORS:
+            if attempt == max_retries:
+                raise
+            time.sleep(_backoff(attempt))
+
+
+async def acall_with_retry(func, *args, limiter: RateLimiter = None, max_retries: int = 6, **kwargs):
+    """Async version of call_with_retry"""
+    for attempt in range(max_retries + 1):
+        if limiter:
+            await limiter.acquire_async()
+        try:
+            return await func(*args, **kwargs)
+        except RETRYABLE_ERRORS:
+            if attempt == max_retries:
+                raise
+            await asyncio.sleep(_backoff(attempt))
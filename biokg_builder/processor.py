@@ -2,10 +2,20 @@
 
 import re
 import os
+import sys
 import pandas as pd
 from typing import List, Dict, Tuple
-from sentence_transformers import SentenceTransformer, util
 from .config import Config
+from .utils.helpers import write_dataframe
+from .cache import EmbeddingCache
+from .embeddings import (
+    backend_available, load_sentence_model,
+    numba_similar_pairs, simsimd_similar_pairs, usearch_similar_pairs
+)
+
+
+# Entity names are a few words long; a short sequence cap avoids encoding padding
+ENTITY_MAX_SEQ_LENGTH = 64
 
 
 class EntityProcessor:
@@ -14,30 +24,58 @@ class EntityProcessor:
     def __init__(self, config: Config):
         self.config = config
         self.pattern = r'\(([^,]+),\s*([^\)]+)\)'
+        self.regex = re.compile(self.pattern)
         self.model = None
+        self.cache = None
     
     def _get_model(self):
         """Lazy load sentence embedding model"""
         if self.model is None and self.config.sentence_model_path:
             try:
-                self.model = SentenceTransformer(self.config.sentence_model_path)
+                self.model = load_sentence_model(self.config.sentence_model_path, ENTITY_MAX_SEQ_LENGTH)
             except Exception as e:
                 print(f"Cannot load model: {e}. Using simple string matching.")
         return self.model
     
+    def _get_cache(self):
+        """Lazy open the entity embedding cache"""
+        if self.cache is None and self.config.use_cache:
+            self.cache = EmbeddingCache(
+                os.path.join(self.config.output_dir, self.config.embedding_cache_file),
+                namespace=f"{self.config.sentence_model_path}/{ENTITY_MAX_SEQ_LENGTH}"
+            )
+        return self.cache
+    
+    def _encode(self, entities: List[str], model):
+        """Normalized entity embeddings as a tensor on the model's device, reusing cached vectors"""
+        import torch
+        
+        def encode(texts):
+            return model.encode(
+                texts,
+                batch_size=64,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False
+            )
+        
+        cache = self._get_cache()
+        embeddings = cache.encode(entities, encode) if cache else encode(entities)
+        # Keep GPU matmuls in half precision; CPU kernels are fastest (and only supported) in float32
+        dtype = torch.float32 if model.device.type == "cpu" else torch.float16
+        return torch.from_numpy(embeddings).to(model.device, dtype=dtype)
+    
     def extract_entities(self, df: pd.DataFrame, column: str = "Answer to Question 2") -> List[str]:
         """Extract all entities from causal relationships"""
         if column not in df.columns:
             return []
         
-        entities = set()
-        for value in df[column].fillna("").astype(str):
-            for match in re.findall(self.pattern, value):
-                entities.update([match[0].strip(), match[1].strip()])
+        matches = df[column].fillna("").astype(str).str.extractall(self.regex)
+        entities = set(matches[0].str.strip()) | set(matches[1].str.strip())
+        entities.discard("")
         
-        entities = [e for e in entities if e]
         print(f"Extracted {len(entities)} unique entities")
-        return sorted(entities)
+        return sorted(sys.intern(e) for e in entities)
     
     def find_similar_entities(self, entities: List[str]) -> Dict[str, str]:
         """Find similar entities using embeddings or string matching"""
@@ -53,51 +91,79 @@ class EntityProcessor:
     def _find_similar_with_embeddings(self, entities: List[str], model) -> Dict[str, str]:
         """Find similar entities using sentence embeddings"""
         print(f"Computing similarity for {len(entities)} entities...")
-        embeddings = model.encode(entities)
-        similar_phrases = {}
+        # Shortest first, so in every pair (i, j) with i < j the entity at i is the one to keep
+        entities = sorted(entities, key=len)
+        embeddings = self._encode(entities, model)
         
-        for i in range(len(entities)):
-            for j in range(i + 1, len(entities)):
-                similarity = util.pytorch_cos_sim(embeddings[i], embeddings[j]).item()
-                if similarity > self.config.similarity_threshold:
-                    # Keep the shorter entity as standard
-                    if len(entities[i]) <= len(entities[j]):
-                        similar_phrases[entities[j]] = entities[i]
-                    else:
-                        similar_phrases[entities[i]] = entities[j]
+        if self.config.use_ann and backend_available("usearch"):
+            pairs = usearch_similar_pairs(
+                embeddings.float().cpu().numpy(), self.config.similarity_threshold,
+                self.config.ann_neighbors, self.config.max_workers
+            )
+        elif self.config.use_numba and backend_available("numba"):
+            pairs = numba_similar_pairs(
+                embeddings.cpu().numpy(), self.config.similarity_threshold, self.config.max_workers
+            )
+        elif embeddings.device.type == "cpu" and backend_available("simsimd"):
+            pairs = simsimd_similar_pairs(
+                embeddings.numpy(), self.config.similarity_threshold, self.config.max_workers,
+                quantize=self.config.quantize_embeddings
+            )
+        else:
+            pairs = self._similar_pairs_matmul(embeddings)
+        
+        similar_phrases = {}
+        for i, j in pairs:
+            # Keep the shorter entity as standard
+            similar_phrases[entities[j]] = entities[i]
         
         print(f"Found {len(similar_phrases)} similar entity pairs")
         return similar_phrases
     
+    def _similar_pairs_matmul(self, embeddings, block_size: int = 4096) -> List[Tuple[int, int]]:
+        """Upper-triangle index pairs above the threshold, from blocked cosine-similarity matmuls"""
+        import torch
+        
+        pairs = []
+        for start in range(0, embeddings.shape[0], block_size):
+            # Upcast the (possibly half-precision) product before comparing against the threshold
+            similarity = (embeddings[start:start + block_size] @ embeddings.T).float()
+            # Keep columns right of the global diagonal only
+            mask = torch.triu(similarity, diagonal=start + 1) > self.config.similarity_threshold
+            index = mask.nonzero(as_tuple=False).cpu()
+            index[:, 0] += start
+            pairs.extend(index.tolist())
+        return pairs
+    
     def _find_similar_with_strings(self, entities: List[str]) -> Dict[str, str]:
-        """Simple string similarity matching"""
+        """Simple string similarity matching: substring relationship or word-set Jaccard"""
+        # Shortest first, so in every pair (i, j) with i < j the entity at i is the one to keep
+        entities = sorted(entities, key=len)
+        lowers = [e.lower() for e in entities]
+        tokens = [frozenset(map(sys.intern, s.split())) for s in lowers]
+        threshold = self.config.similarity_threshold
         similar_phrases = {}
         
         for i in range(len(entities)):
+            lower_i, tokens_i = lowers[i], tokens[i]
             for j in range(i + 1, len(entities)):
-                if self._is_similar(entities[i], entities[j]):
-                    if len(entities[i]) <= len(entities[j]):
-                        similar_phrases[entities[j]] = entities[i]
-                    else:
-                        similar_phrases[entities[i]] = entities[j]
+                # lowers[j] is at least as long, so only one containment direction can hold
+                if lower_i in lowers[j]:
+                    similar_phrases[entities[j]] = entities[i]
+                    continue
+                
+                # Jaccard cannot exceed min/max of the set sizes; skip pairs that cannot pass
+                tokens_j = tokens[j]
+                small, large = sorted((len(tokens_i), len(tokens_j)))
+                if large == 0 or small / large <= threshold:
+                    continue
+                
+                common = len(tokens_i & tokens_j)
+                if common / (len(tokens_i) + len(tokens_j) - common) > threshold:
+                    similar_phrases[entities[j]] = entities[i]
         
         return similar_phrases
     
-    def _is_similar(self, s1: str, s2: str) -> bool:
-        """Check if two strings are similar"""
-        s1_lower, s2_lower = s1.lower(), s2.lower()
-        
-        # Check substring relationship
-        if s1_lower in s2_lower or s2_lower in s1_lower:
-            return True
-        
-        # Check common words
-        words1, words2 = set(s1_lower.split()), set(s2_lower.split())
-        common = len(words1.intersection(words2))
-        total = len(words1.union(words2))
-        
-        return (common / total) > self.config.similarity_threshold if total > 0 else False
-    
     def substitute_similar_entities(self, df: pd.DataFrame, similar_phrases: Dict[str, str],
                                   column: str = "Answer to Question 2") -> pd.DataFrame:
         """Replace similar entities in DataFrame"""
@@ -105,13 +171,13 @@ class EntityProcessor:
             return df
         
         print(f"Replacing {len(similar_phrases)} similar entity pairs...")
-        modified_df = df.copy()
+        # One alternation, longest first, so each cell is scanned once and replacements are never re-matched
+        pattern = re.compile("|".join(re.escape(k) for k in sorted(similar_phrases, key=len, reverse=True)))
         
-        for index, row in modified_df.iterrows():
-            cell_value = str(row[column])
-            for similar, original in similar_phrases.items():
-                cell_value = cell_value.replace(similar, original)
-            modified_df.at[index, column] = cell_value
+        # Only the replaced column is rebuilt; with copy-on-write the other columns are shared, not copied
+        modified_df = df.assign(**{column: df[column].astype(str).str.replace(
+            pattern, lambda m: similar_phrases[m.group(0)], regex=True
+        )})
         
         print("Replacement completed")
         return modified_df
@@ -130,7 +196,8 @@ class EntityProcessor:
         output_dir = output_dir or self.config.output_dir
         os.makedirs(output_dir, exist_ok=True)
         
-        output_file = os.path.join(output_dir, self.config.processed_results_pattern.format(keyword=keyword))
-        df.to_excel(output_file, index=False)
+        output_file = os.path.join(output_dir, self.config.table_filename(
+            self.config.processed_results_pattern, keyword=keyword))
+        write_dataframe(df, output_file, self.config.output_format)
         print(f"Saved to: {output_file}")
         return output_file
\ No newline at end of file
@@ -1,9 +1,15 @@
 """PubMed Literature Search Module"""
 
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+from xml.etree import ElementTree
 from typing import List, Dict, Any
 import pandas as pd
 from Bio import Entrez
 from .config import Config
+from .cache import SQLiteCache
+from .utils.helpers import write_dataframe
 
 
 class PubMedSearcher:
@@ -17,6 +23,7 @@ class PubMedSearcher:
             config: Configuration object
         """
         self.config = config
+        self.cache = None
         Entrez.email = config.email
     
     def search_pubmed(self, keyword: str, max_results: int = None) -> List[str]:
@@ -40,6 +47,15 @@ class PubMedSearcher:
         
         return record["IdList"]
     
+    def _get_cache(self):
+        """Lazy open the article cache"""
+        if self.cache is None and self.config.use_cache:
+            self.cache = SQLiteCache(
+                os.path.join(self.config.output_dir, self.config.pubmed_cache_file),
+                table="articles"
+            )
+        return self.cache
+    
     def fetch_details(self, id_list: List[str]) -> List[Dict[str, Any]]:
         """
         Fetch article details
@@ -52,55 +68,93 @@ class PubMedSearcher:
         """
         if not id_list:
             return []
+        
+        cache = self._get_cache()
+        articles = {}
+        if cache:
+            cached = cache.get_many([str(pmid) for pmid in id_list])
+            articles = {pmid: json.loads(value) for pmid, value in cached.items()}
+        
+        missing = [pmid for pmid in id_list if str(pmid) not in articles]
+        if missing:
+            size = self.config.fetch_batch_size
+            chunks = [missing[i:i + size] for i in range(0, len(missing), size)]
             
+            # Chunks are fetched concurrently; NCBI allows 3 requests/s without an API key
+            with ThreadPoolExecutor(max_workers=min(self.config.fetch_workers, len(chunks))) as executor:
+                for chunk_articles in executor.map(self._fetch_chunk, chunks):
+                    for article in chunk_articles:
+                        articles[article['PMID']] = article
+                    if cache:
+                        cache.set_many([(article['PMID'], json.dumps(article, ensure_ascii=False))
+                                        for article in chunk_articles])
+        
+        return [articles[str(pmid)] for pmid in id_list if str(pmid) in articles]
+    
+    def _fetch_chunk(self, id_list: List[str]) -> List[Dict[str, Any]]:
+        """Fetch one efetch request worth of articles, parsing the XML as it streams in"""
         ids = ','.join(id_list)
+        articles = []
+        root = None
         
         with Entrez.efetch(db="pubmed", id=ids, retmode="xml") as handle:
-            records = Entrez.read(handle)
-        
-        articles = []
-        for pubmed_article in records.get('PubmedArticle', []):
-            article = {}
-            article_data = pubmed_article['MedlineCitation']['Article']
-            
-            # Extract title
-            article['Title'] = article_data.get('ArticleTitle', '')
-            
-            # Extract abstract
-            abstract_text = article_data.get('Abstract', {}).get('AbstractText', [])
-            if isinstance(abstract_text, list):
-                abstract_text = ' '.join(str(text) for text in abstract_text)
-            article['Abstract'] = abstract_text
-            
-            # Extract journal
-            article['Journal'] = article_data.get('Journal', {}).get('Title', '')
-            
-            # Extract author information
-            authors = []
-            author_list = article_data.get('AuthorList', [])
-            for author in author_list:
-                last_name = author.get('LastName', '')
-                fore_name = author.get('ForeName', '')
-                if last_name or fore_name:
-                    authors.append(f"{fore_name} {last_name}".strip())
-            article['Authors'] = '; '.join(authors)
-            
-            # Extract publication date
-            pub_date = article_data.get('Journal', {}).get('JournalIssue', {}).get('PubDate', {})
-            year = pub_date.get('Year', '')
-            month = pub_date.get('Month', '')
-            article['PubDate'] = f"{year}-{month}" if month else year
-            
-            # Extract PMID
-            article['PMID'] = pubmed_article['MedlineCitation'].get('PMID', '')
-            
-            articles.append(article)
+            for event, elem in ElementTree.iterparse(handle, events=('start', 'end')):
+                if root is None:
+                    root = elem
+                elif event == 'end' and elem.tag in ('PubmedArticle', 'PubmedBookArticle'):
+                    if elem.tag == 'PubmedArticle':
+                        articles.append(self._parse_article(elem))
+                    # Drop finished records so memory stays flat regardless of response size
+                    root.clear()
         
         return articles
     
+    @staticmethod
+    def _text(elem) -> str:
+        """Full text of an element including inline markup such as <i>, or '' if missing"""
+        return ''.join(elem.itertext()).strip() if elem is not None else ''
+    
+    @classmethod
+    def _parse_article(cls, pubmed_article) -> Dict[str, Any]:
+        """Extract the article fields used downstream from a <PubmedArticle> element"""
+        article = {}
+        citation = pubmed_article.find('MedlineCitation')
+        article_data = citation.find('Article')
+        
+        # Extract title
+        article['Title'] = cls._text(article_data.find('ArticleTitle'))
+        
+        # Extract abstract
+        article['Abstract'] = ' '.join(
+            cls._text(text) for text in article_data.iterfind('Abstract/AbstractText')
+        )
+        
+        # Extract journal
+        article['Journal'] = cls._text(article_data.find('Journal/Title'))
+        
+        # Extract author information
+        authors = []
+        for author in article_data.iterfind('AuthorList/Author'):
+            last_name = author.findtext('LastName', '')
+            fore_name = author.findtext('ForeName', '')
+            if last_name or fore_name:
+                authors.append(f"{fore_name} {last_name}".strip())
+        article['Authors'] = '; '.join(authors)
+        
+        # Extract publication date
+        pub_date = article_data.find('Journal/JournalIssue/PubDate')
+        year = pub_date.findtext('Year', '') if pub_date is not None else ''
+        month = pub_date.findtext('Month', '') if pub_date is not None else ''
+        article['PubDate'] = f"{year}-{month}" if month else year
+        
+        # Extract PMID
+        article['PMID'] = citation.findtext('PMID', '')
+        
+        return article
+    
     def search_and_save(self, keyword: str, output_dir: str = None) -> tuple:
         """
-        Search and save results to Excel
+        Search and save results in the configured output format
         
         Args:
             keyword: Search keyword
@@ -125,11 +179,11 @@ class PubMedSearcher:
         # Convert to DataFrame
         df = pd.DataFrame(articles)
         
-        # Save to Excel
-        import os
+        # Save results
         os.makedirs(output_dir, exist_ok=True)
-        filename = os.path.join(output_dir, f"{keyword}_pubmed_search_results.xlsx")
-        df.to_excel(filename, index=False)
+        filename = os.path.join(output_dir, self.config.table_filename(
+            self.config.search_results_pattern, keyword=keyword))
+        write_dataframe(df, filename, self.config.output_format)
         
         print(f"Found {len(articles)} articles, saved to {filename}")
         return df, filename
\ No newline at end of file
@@ -6,7 +6,10 @@ from .helpers import (
     create_output_directory,
     clean_text,
     merge_dataframes,
-    export_to_formats
+    export_to_formats,
+    write_dataframe,
+    read_dataframe,
+    DATAFRAME_EXTENSIONS
 )
 
 __all__ = [
@@ -15,5 +18,8 @@ __all__ = [
     'create_output_directory',
     'clean_text',
     'merge_dataframes',
-    'export_to_formats'
+    'export_to_formats',
+    'write_dataframe',
+    'read_dataframe',
+    'DATAFRAME_EXTENSIONS'
 ]
\ No newline at end of file
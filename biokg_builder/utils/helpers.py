@@ -1,9 +1,19 @@
 """辅助工具函数"""
 
+from __future__ import annotations
+
 import os
 import re
-import pandas as pd
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_API_KEY_RE = re.compile(r'[A-Za-z0-9_-]+')
+_KEYWORD_STRIP_RE = re.compile(r'[^\w\s-]')
+_KEYWORD_DASH_RE = re.compile(r'[-\s]+')
 
 
 def validate_email(email: str) -> bool:
@@ -16,8 +26,7 @@ def validate_email(email: str) -> bool:
     Returns:
         bool: 是否有效
     """
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
+    return bool(_EMAIL_RE.match(email))
 
 
 def validate_api_key(api_key: str) -> bool:
@@ -34,11 +43,8 @@ def validate_api_key(api_key: str) -> bool:
     if not api_key or len(api_key) < 20:
         return False
     
-    # 检查是否包含非法字符
-    if not api_key.replace('-', '').replace('_', '').isalnum():
-        return False
-    
-    return True
+    # 检查是否包含非法字符(仅允许字母、数字、-和_)
+    return _API_KEY_RE.fullmatch(api_key) is not None
 
 
 def create_output_directory(base_dir: str, keyword: str) -> str:
@@ -53,8 +59,8 @@ def create_output_directory(base_dir: str, keyword: str) -> str:
         str: 创建的目录路径
     """
     # 清理关键词，移除特殊字符
-    clean_keyword = re.sub(r'[^\w\s-]', '', keyword).strip()
-    clean_keyword = re.sub(r'[-\s]+', '-', clean_keyword)
+    clean_keyword = _KEYWORD_STRIP_RE.sub('', keyword).strip()
+    clean_keyword = _KEYWORD_DASH_RE.sub('-', clean_keyword)
     
     # 创建目录
     output_dir = os.path.join(base_dir, clean_keyword)
@@ -63,6 +69,10 @@ def create_output_directory(base_dir: str, keyword: str) -> str:
     return output_dir
 
 
+# 控制字符删除表(保留\t和\n)
+_CONTROL_CHARS = dict.fromkeys(i for i in range(32) if chr(i) not in '\n\t')
+
+
 def clean_text(text: str) -> str:
     """
     清理文本，移除多余的空白和特殊字符
@@ -80,9 +90,7 @@ def clean_text(text: str) -> str:
     text = ' '.join(text.split())
     
     # 移除控制字符
-    text = ''.join(char for char in text if ord(char) >= 32 or char in '\n\t')
-    
-    return text.strip()
+    return text.translate(_CONTROL_CHARS).strip()
 
 
 def merge_dataframes(df_list: List[pd.DataFrame], 
@@ -99,6 +107,8 @@ def merge_dataframes(df_list: List[pd.DataFrame],
     Returns:
         pd.DataFrame: 合并后的DataFrame
     """
+    import pandas as pd
+    
     if not df_list:
         return pd.DataFrame()
     
@@ -129,13 +139,19 @@ def export_to_formats(df: pd.DataFrame, base_filename: str,
         Dict[str, str]: {格式: 文件路径}字典
     """
     if formats is None:
-        formats = ['excel', 'csv', 'json']
+        formats = ['parquet', 'csv', 'json']
     
     exported_files = {}
     
     for fmt in formats:
         try:
-            if fmt == 'excel':
+            if fmt == 'parquet':
+                filepath = f"{base_filename}.parquet"
+                df.to_parquet(filepath, engine='pyarrow', compression='zstd', index=False)
+            elif fmt == 'feather':
+                filepath = f"{base_filename}.feather"
+                df.reset_index(drop=True).to_feather(filepath)
+            elif fmt == 'excel':
                 filepath = f"{base_filename}.xlsx"
                 df.to_excel(filepath, index=False)
             elif fmt == 'csv':
@@ -159,6 +175,70 @@ def export_to_formats(df: pd.DataFrame, base_filename: str,
     return exported_files
 
 
+# 表格输出格式 -> 文件扩展名
+DATAFRAME_EXTENSIONS = {
+    'parquet': 'parquet',
+    'feather': 'feather',
+    'excel': 'xlsx',
+    'csv': 'csv'
+}
+
+
+def write_dataframe(df: pd.DataFrame, filepath: str, fmt: str = 'parquet') -> str:
+    """
+    按指定格式保存DataFrame
+    
+    Args:
+        df: 要保存的DataFrame
+        filepath: 文件路径
+        fmt: 输出格式(parquet, feather, excel, csv)
+        
+    Returns:
+        str: 文件路径
+    """
+    if fmt == 'parquet':
+        df.to_parquet(filepath, engine='pyarrow', compression='zstd', index=False)
+    elif fmt == 'feather':
+        df.reset_index(drop=True).to_feather(filepath)
+    elif fmt == 'excel':
+        df.to_excel(filepath, index=False)
+    elif fmt == 'csv':
+        df.to_csv(filepath, index=False, encoding='utf-8')
+    else:
+        raise ValueError(f"不支持的输出格式: {fmt}")
+    
+    return filepath
+
+
+def read_dataframe(filepath: str, fmt: Optional[str] = None) -> pd.DataFrame:
+    """
+    读取write_dataframe保存的文件
+    
+    Args:
+        filepath: 文件路径
+        fmt: 文件格式(parquet, feather, excel, csv)，为None时按扩展名判断
+        
+    Returns:
+        pd.DataFrame: 读取的DataFrame
+    """
+    import pandas as pd
+    
+    if fmt is None:
+        ext = os.path.splitext(filepath)[1].lstrip('.').lower()
+        fmt = {'xlsx': 'excel', 'xls': 'excel'}.get(ext, ext)
+    
+    if fmt == 'parquet':
+        return pd.read_parquet(filepath)
+    elif fmt == 'feather':
+        return pd.read_feather(filepath)
+    elif fmt == 'excel':
+        return pd.read_excel(filepath)
+    elif fmt == 'csv':
+        return pd.read_csv(filepath, keep_default_na=False)
+    else:
+        raise ValueError(f"不支持的文件格式: {filepath}")
+
+
 def calculate_text_similarity(text1: str, text2: str) -> float:
     """
     计算两个文本的相似度（简单版本）
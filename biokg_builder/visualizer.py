@@ -2,19 +2,60 @@
 
 import re
 import os
+import sys
+import numpy as np
 import pandas as pd
 import networkx as nx
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
 from typing import List, Tuple
 from pyvis.network import Network
+from pyvis.node import Node
 from .config import Config
 
 
+# pyvis default node color
+NODE_COLOR = '#97c2fc'
+
+
 class NetworkVisualizer:
     """Network Visualization Class"""
     
     def __init__(self, config: Config):
         self.config = config
         self.pattern = r'\(([^,]+),\s*([^\)]+)\)'
+        self.regex = re.compile(self.pattern)
+    
+    def _extract_edges(self, df: pd.DataFrame, column: str = 'Answer to Question 2') -> pd.DataFrame:
+        """All (source, target, title) relations in one vectorized regex pass, in row order"""
+        if column not in df.columns:
+            return pd.DataFrame(columns=['source', 'target', 'title'], dtype=object)
+        
+        matches = df[column].reset_index(drop=True).fillna('').astype(str).str.extractall(self.regex)
+        titles = df['Title'].fillna('Unknown').astype(str).to_numpy() if 'Title' in df.columns \
+            else np.full(len(df), 'Unknown', dtype=object)
+        
+        # Interned, so every occurrence of an entity shares one string object (and its cached hash)
+        edges = pd.DataFrame({
+            'source': np.array([sys.intern(entity) for entity in matches[0].str.strip()], dtype=object),
+            'target': np.array([sys.intern(entity) for entity in matches[1].str.strip()], dtype=object),
+            'title': titles[matches.index.get_level_values(0)],
+        })
+        return edges[(edges['source'] != '') & (edges['target'] != '')].reset_index(drop=True)
+    
+    @staticmethod
+    def _add_unique_nodes(net: Network, nodes: List[str]) -> None:
+        """
+        Add already-deduplicated nodes in one pass
+        
+        Network.add_node scans the node id list on every call, which is quadratic over a whole
+        graph, and Network.add_nodes also turns numeric-looking names such as "6" into ints.
+        """
+        for node in nodes:
+            options = Node(node, 'dot', label=node, color=NODE_COLOR, font_color=net.font_color).options
+            net.nodes.append(options)
+            net.node_ids.append(node)
+            net.node_map[node] = options
     
     def create_full_network(self, df: pd.DataFrame, keyword: str) -> str:
         """Create complete knowledge graph"""
@@ -25,30 +66,32 @@ class NetworkVisualizer:
             font_color=self.config.network_font_color
         )
         
-        unique_nodes = set()
-        edge_count = 0
-        
-        for _, row in df.iterrows():
-            value = str(row.get('Answer to Question 2', ''))
-            source = str(row.get('Title', 'Unknown'))
-            
-            for match in re.findall(self.pattern, value):
-                entity_a, entity_b = match[0].strip(), match[1].strip()
-                if entity_a and entity_b:
-                    net.add_node(entity_a, label=entity_a)
-                    net.add_node(entity_b, label=entity_b)
-                    net.add_edge(entity_a, entity_b, title=source)
-                    unique_nodes.update([entity_a, entity_b])
-                    edge_count += 1
+        edges = self._extract_edges(df)
+        nodes = pd.unique(edges[['source', 'target']].to_numpy().ravel()).tolist()
+        
+        self._add_unique_nodes(net, nodes)
+        
+        # Network.add_edge scans every existing edge for an undirected duplicate; dedupe up front
+        # instead (first title wins, as with add_edge) and hand pyvis the edge list in one go
+        source, target = edges['source'].to_numpy(), edges['target'].to_numpy()
+        swap = source > target
+        unique_edges = edges[~pd.DataFrame({
+            'a': np.where(swap, target, source),
+            'b': np.where(swap, source, target)
+        }).duplicated()]
+        net.edges = [
+            {'title': title, 'from': entity_a, 'to': entity_b}
+            for entity_a, entity_b, title in unique_edges.itertuples(index=False)
+        ]
         
         net.set_options(self.config.get_network_options())
         
         os.makedirs(self.config.output_dir, exist_ok=True)
         filename = os.path.join(self.config.output_dir, 
                                self.config.full_network_pattern.format(keyword=keyword))
-        net.write_html(filename)
+        net.write_html(filename, notebook=False)
         
-        print(f"Created full network: {len(unique_nodes)} nodes, {edge_count} edges")
+        print(f"Created full network: {len(nodes)} nodes, {len(net.edges)} edges")
         return filename
     
     def create_filtered_network(self, df: pd.DataFrame, keyword: str, 
@@ -57,24 +100,23 @@ class NetworkVisualizer:
         """Create filtered knowledge graph"""
         exclude_entities = exclude_entities or []
         
+        edges = self._extract_edges(df)
+        
+        # Check exclusions
+        for exc in exclude_entities:
+            edges = edges[
+                ~edges['source'].str.contains(exc, regex=False) &
+                ~edges['target'].str.contains(exc, regex=False)
+            ]
+        
         # Build NetworkX graph
         G = nx.Graph()
-        
-        for _, row in df.iterrows():
-            value = str(row.get('Answer to Question 2', ''))
-            source = str(row.get('Title', 'Unknown'))
-            
-            for match in re.findall(self.pattern, value):
-                entity_a, entity_b = match[0].strip(), match[1].strip()
-                
-                # Check exclusions
-                if (entity_a and entity_b and
-                    not any(exc in entity_a for exc in exclude_entities) and 
-                    not any(exc in entity_b for exc in exclude_entities)):
-                    
-                    G.add_node(entity_a, label=entity_a)
-                    G.add_node(entity_b, label=entity_b)
-                    G.add_edge(entity_a, entity_b, title=source)
+        nodes = pd.unique(edges[['source', 'target']].to_numpy().ravel())
+        G.add_nodes_from((node, {'label': node}) for node in nodes)
+        G.add_edges_from(
+            (entity_a, entity_b, {'title': source})
+            for entity_a, entity_b, source in edges.itertuples(index=False)
+        )
         
         # Find related nodes
         filtered_graph = self._search_network(G, search_keyword, depth)
@@ -97,7 +139,7 @@ class NetworkVisualizer:
         filename = os.path.join(self.config.output_dir,
                                self.config.filtered_network_pattern.format(
                                    keyword=keyword, search_keyword=search_keyword))
-        net.write_html(filename)
+        net.write_html(filename, notebook=False)
         
         node_names = list(filtered_graph.nodes())
         print(f"Created filtered network: {len(node_names)} nodes")
@@ -128,27 +170,32 @@ class NetworkVisualizer:
     
     def analyze_network_structure(self, df: pd.DataFrame) -> dict:
         """Analyze network structure"""
-        G = nx.Graph()
+        edges = self._extract_edges(df)
+        if edges.empty:
+            return {"error": "Empty graph"}
         
-        for _, row in df.iterrows():
-            value = str(row.get('Answer to Question 2', ''))
-            for match in re.findall(self.pattern, value):
-                entity_a, entity_b = match[0].strip(), match[1].strip()
-                if entity_a and entity_b:
-                    G.add_edge(entity_a, entity_b)
+        # Intern entities to ids in first-seen order, then keep each undirected edge once
+        ids, nodes = pd.factorize(edges[['source', 'target']].to_numpy().ravel())
+        n = len(nodes)
+        pairs = np.unique(np.sort(ids.reshape(-1, 2), axis=1), axis=0)
+        u, v = pairs[:, 0], pairs[:, 1]
+        edge_count = len(pairs)
         
-        if not G.nodes():
-            return {"error": "Empty graph"}
+        # A self-loop adds 2 to its node's degree, as in NetworkX
+        degrees = np.bincount(u, minlength=n) + np.bincount(v, minlength=n)
+        adjacency = sparse.coo_matrix((np.ones(edge_count), (u, v)), shape=(n, n)).tocsr()
+        n_components, _ = connected_components(adjacency, directed=False)
         
         # Calculate basic statistics
-        degree_centrality = nx.degree_centrality(G)
-        top_nodes = sorted(degree_centrality.items(), key=lambda x: x[1], reverse=True)[:10]
+        degree_centrality = degrees * (1.0 / (n - 1)) if n > 1 else np.ones(n)
+        top = np.argsort(-degree_centrality, kind='stable')[:10]
+        top_nodes = [(nodes[i], float(degree_centrality[i])) for i in top]
         
         return {
-            "node_count": G.number_of_nodes(),
-            "edge_count": G.number_of_edges(),
-            "average_degree": sum(dict(G.degree()).values()) / G.number_of_nodes(),
-            "density": nx.density(G),
-            "connected_components": nx.number_connected_components(G),
+            "node_count": n,
+            "edge_count": edge_count,
+            "average_degree": 2 * edge_count / n,
+            "density": 2 * edge_count / (n * (n - 1)) if n > 1 else 0,
+            "connected_components": int(n_components),
             "top_10_nodes_by_degree": top_nodes
-        }
\ No newline at end of file
+        }
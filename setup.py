@@ -42,6 +42,13 @@ setup(
             "flake8>=4.0",
             "mypy>=0.910",
         ],
+        "fast": [
+            "orjson>=3.6",
+            "numba>=0.56",
+            "simsimd>=3.0",
+            "usearch>=2.0",
+            "tiktoken>=0.4",
+        ],
     },
     entry_points={
         "console_scripts": [